@@ -1,10 +1,13 @@
 import os
 import logging
+import orjson
 from flask import Flask, request, jsonify
+from flask.json.provider import JSONProvider
 from flask_cors import CORS
 from services.youtube_service import YouTubeService
 from services.acrcloud_service import ACRCloudService
 from services.spotify_service import SpotifyService
+from services.scan_task_service import ScanTaskService
 
 # Configure logging
 logging.basicConfig(
@@ -13,14 +16,26 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+class OrjsonProvider(JSONProvider):
+    """Flask JSON provider backed by orjson (used by jsonify and request.get_json)"""
+
+    def dumps(self, obj, **kwargs):
+        return orjson.dumps(obj, option=orjson.OPT_NON_STR_KEYS).decode('utf-8')
+
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
+
+
 # Initialize Flask app
 app = Flask(__name__)
+app.json = OrjsonProvider(app)
 CORS(app)
 
 # Initialize services
 youtube_service = YouTubeService()
 acrcloud_service = ACRCloudService()
 spotify_service = SpotifyService()
+scan_task_service = ScanTaskService()
 
 
 @app.route('/health', methods=['GET'])
@@ -33,6 +48,94 @@ def health():
     }), 200
 
 
+def run_scan(youtube_url, on_progress=None):
+    """
+    Run the full scan pipeline for a YouTube URL
+    
+    Args:
+        youtube_url: YouTube video URL
+        on_progress: Optional callback receiving progress (0.0 - 1.0)
+    
+    Returns:
+        (response_dict, status_code)
+    """
+    def report(progress):
+        if on_progress:
+            on_progress(progress)
+    
+    logger.info(f"📥 Scanning YouTube URL: {youtube_url}")
+    
+    # Steps 1 & 2: one Apify run gives the audio and (usually) the metadata
+    logger.info("⬇️ Step 1: Getting video metadata...")
+    logger.info("🎵 Step 2: Downloading audio via Apify...")
+    
+    # Metadata resolves with (or after) the download, the longest stage:
+    # 0.2 = download started, 0.6 = clip and metadata ready
+    report(0.2)
+    video_info, audio_path = youtube_service.fetch_all(youtube_url)
+    
+    if not video_info['success']:
+        return {
+            'success': False,
+            'error': video_info['error'],
+            'message': video_info['message']
+        }, 400
+    
+    if not audio_path:
+        return {
+            'success': False,
+            'error': 'download_failed',
+            'message': 'Failed to download audio from YouTube'
+        }, 500
+    
+    report(0.6)
+    
+    # Step 3: Identify with ACR Cloud (only once metadata succeeded - billed per call)
+    logger.info("🔍 Step 3: Identifying audio with ACR Cloud...")
+    matches = acrcloud_service.identify_audio(audio_path)
+    
+    # Clean up audio file
+    youtube_service.cleanup_audio(audio_path)
+    
+    report(0.8)
+    
+    uploaded_beat = {
+        'title': video_info['title'],
+        'author': video_info['author'],
+        'youtube_url': youtube_url,
+        'views_number': video_info['views'],
+        'thumbnail': video_info['thumbnail']
+    }
+    
+    if not matches:
+        logger.info("ℹ️ No matches found in ACR Cloud")
+        report(1.0)
+        return {
+            'success': True,
+            'uploaded_beat': uploaded_beat,
+            'matched_songs': [],
+            'results_count': 0
+        }, 200
+    
+    logger.info(f"✅ ACR Cloud found {len(matches)} matches")
+    
+    # Step 4: Enrich with Spotify metadata
+    logger.info("🎵 Step 4: Enriching with Spotify metadata...")
+    enriched_songs = spotify_service.enrich_tracks(matches)
+    
+    logger.info(f"✅ Enriched {len(enriched_songs)} songs with Spotify data")
+    
+    report(1.0)
+    
+    # Return results
+    return {
+        'success': True,
+        'uploaded_beat': uploaded_beat,
+        'matched_songs': enriched_songs,
+        'results_count': len(enriched_songs)
+    }, 200
+
+
 @app.route('/scan', methods=['POST'])
 def scan_beat():
     """
@@ -40,7 +143,8 @@ def scan_beat():
     
     Expected JSON body:
     {
-        "youtube_url": "https://www.youtube.com/watch?v=..."
+        "youtube_url": "https://www.youtube.com/watch?v=...",
+        "async": false  (optional - run in background and return a task_id)
     }
     
     Returns:
@@ -50,6 +154,13 @@ def scan_beat():
         "matched_songs": [...],
         "results_count": int
     }
+    
+    Returns (async):
+    {
+        "success": true,
+        "task_id": "...",
+        "status": "queued"
+    }
     """
     try:
         # Get YouTube URL from request
@@ -64,89 +175,60 @@ def scan_beat():
         
         youtube_url = data['youtube_url']
         
-        logger.info(f"📥 Scanning YouTube URL: {youtube_url}")
-        
-        # Step 1: Get video metadata
-        logger.info("⬇️ Step 1: Getting video metadata...")
-        video_info = youtube_service.get_video_info(youtube_url)
-        
-        if not video_info['success']:
-            return jsonify({
-                'success': False,
-                'error': video_info['error'],
-                'message': video_info['message']
-            }), 400
-        
-        # Step 2: Download audio via Apify
-        logger.info("🎵 Step 2: Downloading audio via Apify...")
-        audio_path = youtube_service.download_audio(youtube_url)
-        
-        if not audio_path:
-            return jsonify({
-                'success': False,
-                'error': 'download_failed',
-                'message': 'Failed to download audio from YouTube'
-            }), 500
-        
-        # Step 3: Identify audio with ACR Cloud
-        logger.info("🔍 Step 3: Identifying audio with ACR Cloud...")
-        matches = acrcloud_service.identify_audio(audio_path)
-        
-        # Clean up audio file
-        youtube_service.cleanup_audio(audio_path)
-        
-        if not matches:
-            logger.info("ℹ️ No matches found in ACR Cloud")
+        if data.get('async'):
+            task_id = scan_task_service.submit(run_scan, youtube_url)
             return jsonify({
                 'success': True,
-                'uploaded_beat': {
-                    'title': video_info['title'],
-                    'author': video_info['author'],
-                    'youtube_url': youtube_url,
-                    'views_number': video_info['views'],
-                    'thumbnail': video_info['thumbnail']
-                },
-                'matched_songs': [],
-                'results_count': 0
-            }), 200
+                'task_id': task_id,
+                'status': 'queued'
+            }), 202
         
-        logger.info(f"✅ ACR Cloud found {len(matches)} matches")
-        
-        # Step 4: Enrich with Spotify metadata
-        logger.info("🎵 Step 4: Enriching with Spotify metadata...")
-        enriched_songs = spotify_service.enrich_tracks(matches)
-        
-        logger.info(f"✅ Enriched {len(enriched_songs)} songs with Spotify data")
-        
-        # Return results
-        return jsonify({
-            'success': True,
-            'uploaded_beat': {
-                'title': video_info['title'],
-                'author': video_info['author'],
-                'youtube_url': youtube_url,
-                'views_number': video_info['views'],
-                'thumbnail': video_info['thumbnail']
-            },
-            'matched_songs': enriched_songs,
-            'results_count': len(enriched_songs)
-        }), 200
+        result, status_code = run_scan(youtube_url)
+        return jsonify(result), status_code
         
     except Exception as e:
         logger.error(f"❌ Unexpected error: {str(e)}", exc_info=True)
         return jsonify({
             'success': False,
             'error': 'internal_error',
-            'message': f'Internal server error: {str(e)}'
+            'message': 'Internal server error'
         }), 500
 
 
-if __name__ == '__main__':
-    # Log environment variables status
+@app.route('/scan/<task_id>', methods=['GET'])
+def scan_status(task_id):
+    """
+    Get progress/result of a background scan
+    
+    Returns:
+    {
+        "success": true,
+        "task_id": "...",
+        "status": "queued" | "running" | "completed" | "failed",
+        "progress": 0.0 - 1.0,
+        "result": {...} (same body as a synchronous /scan, once finished)
+    }
+    """
+    task = scan_task_service.get(task_id)
+    
+    if task is None:
+        return jsonify({
+            'success': False,
+            'error': 'task_not_found',
+            'message': 'Unknown or expired task_id'
+        }), 404
+    
+    return jsonify({
+        'success': True,
+        'task_id': task_id,
+        **task
+    }), 200
+
+
+def log_environment():
+    """Log environment variables status"""
     logger.info("🚀 Starting BeatLink Backend...")
     logger.info(f"✅ APIFY_API_TOKEN: {'Set' if os.getenv('APIFY_API_TOKEN') else 'Missing'}")
     logger.info(f"✅ YOUTUBE_API_KEY: {'Set' if os.getenv('YOUTUBE_API_KEY') else 'Missing'}")
     logger.info(f"✅ ACR Cloud credentials: {'Set' if all([os.getenv('ACR_HOST'), os.getenv('ACR_ACCESS_KEY'), os.getenv('ACR_SECRET_KEY')]) else 'Missing'}")
     logger.info(f"✅ Spotify credentials: {'Set' if all([os.getenv('SPOTIFY_CLIENT_ID'), os.getenv('SPOTIFY_CLIENT_SECRET')]) else 'Missing'}")
-    
-    app.run(host='0.0.0.0', port=int(os.getenv('PORT', 5000)), debug=False)
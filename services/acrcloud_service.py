@@ -1,10 +1,12 @@
 import os
 import logging
+import orjson
 import base64
 import hashlib
 import hmac
 import time
 import requests
+from services.http_session import create_session
 
 logger = logging.getLogger(__name__)
 
@@ -12,25 +14,32 @@ logger = logging.getLogger(__name__)
 class ACRCloudService:
     """Service to identify audio using ACR Cloud fingerprinting"""
 
+    HTTP_METHOD = "POST"
+    HTTP_URI = "/v1/identify"
+    DATA_TYPE = "audio"
+    SIGNATURE_VERSION = "1"
+
     def __init__(self):
         self.host = os.getenv("ACR_HOST")
         self.access_key = os.getenv("ACR_ACCESS_KEY")
         self.secret_key = os.getenv("ACR_SECRET_KEY")
         
+        # Shared session so TCP+TLS connections are reused across calls
+        self.session = create_session()
+        
         if all([self.host, self.access_key, self.secret_key]):
+            # Everything but the timestamp is constant: precompute the key schedule and prefix
+            self._hmac_template = hmac.new(self.secret_key.encode('utf-8'), digestmod=hashlib.sha1)
+            self._sig_prefix = f"{self.HTTP_METHOD}\n{self.HTTP_URI}\n{self.access_key}\n{self.DATA_TYPE}\n{self.SIGNATURE_VERSION}\n"
             logger.info("✅ ACR Cloud credentials configured")
         else:
             logger.error("❌ ACR Cloud credentials missing")
 
-    def _generate_signature(self, string_to_sign):
+    def _generate_signature(self, timestamp):
         """Generate HMAC signature for ACR Cloud API"""
-        return base64.b64encode(
-            hmac.new(
-                self.secret_key.encode('utf-8'),
-                string_to_sign.encode('utf-8'),
-                digestmod=hashlib.sha1
-            ).digest()
-        ).decode('utf-8')
+        h = self._hmac_template.copy()
+        h.update((self._sig_prefix + timestamp).encode('utf-8'))
+        return base64.b64encode(h.digest()).decode('utf-8')
 
     def identify_audio(self, audio_file_path):
         """
@@ -55,50 +64,41 @@ class ACRCloudService:
         try:
             logger.info(f"🔍 Identifying audio with ACR Cloud...")
             
-            # Read audio file
-            with open(audio_file_path, 'rb') as f:
-                audio_data = f.read()
+            # File size is signed up-front, the file itself is streamed
+            sample_bytes = os.path.getsize(audio_file_path)
             
             # Prepare request
-            http_method = "POST"
-            http_uri = "/v1/identify"
-            data_type = "audio"
-            signature_version = "1"
             timestamp = str(int(time.time()))
             
             # Generate signature
-            string_to_sign = f"{http_method}\n{http_uri}\n{self.access_key}\n{data_type}\n{signature_version}\n{timestamp}"
-            signature = self._generate_signature(string_to_sign)
-            
-            # Prepare form data
-            files = {
-                'sample': ('audio.mp3', audio_data, 'audio/mpeg')
-            }
+            signature = self._generate_signature(timestamp)
             
             data = {
                 'access_key': self.access_key,
-                'data_type': data_type,
-                'signature_version': signature_version,
+                'data_type': self.DATA_TYPE,
+                'signature_version': self.SIGNATURE_VERSION,
                 'signature': signature,
-                'sample_bytes': len(audio_data),
+                'sample_bytes': sample_bytes,
                 'timestamp': timestamp
             }
             
             # Send request
-            url = f"https://{self.host}{http_uri}"
+            url = f"https://{self.host}{self.HTTP_URI}"
             
-            response = requests.post(
-                url,
-                files=files,
-                data=data,
-                timeout=30
-            )
+            # Pass the file handle directly instead of reading the MP3 into memory
+            with open(audio_file_path, 'rb') as f:
+                response = self.session.post(
+                    url,
+                    files={'sample': ('audio.mp3', f, 'audio/mpeg')},
+                    data=data,
+                    timeout=30
+                )
             
             if response.status_code != 200:
                 logger.error(f"❌ ACR Cloud API error: {response.status_code}")
                 return []
             
-            result = response.json()
+            result = orjson.loads(response.content)
             
             status = result.get('status', {})
             status_code = status.get('code', -1)
@@ -122,29 +122,18 @@ class ACRCloudService:
                 return []
             
             # Format all results (no score filter)
-            matches = []
-            
-            for music in music_list:
-                score = music.get('score', 0)
-                
-                title = music.get('title', 'Unknown')
-                artists = music.get('artists', [])
-                artist_names = ', '.join([a.get('name', 'Unknown') for a in artists])
-                
-                # Get Spotify ID if available
-                external_metadata = music.get('external_metadata', {})
-                spotify_data = external_metadata.get('spotify', {})
-                spotify_track = spotify_data.get('track', {})
-                spotify_id = spotify_track.get('id', '')
-                
-                match = {
-                    'title': title,
-                    'artists': artist_names,
-                    'spotify_id': f"spotify:track:{spotify_id}" if spotify_id else '',
-                    'score': score
+            matches = [
+                {
+                    'title': music.get('title', 'Unknown'),
+                    'artists': ', '.join(a.get('name', 'Unknown') for a in music.get('artists', ())),
+                    # Get Spotify ID if available
+                    'spotify_id': f"spotify:track:{spotify_id}" if (
+                        spotify_id := music.get('external_metadata', {}).get('spotify', {}).get('track', {}).get('id', '')
+                    ) else '',
+                    'score': music.get('score', 0)
                 }
-                
-                matches.append(match)
+                for music in music_list
+            ]
             
             logger.info(f"✅ Found {len(matches)} matches (all scores included)")
             
@@ -0,0 +1,35 @@
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+
+def create_session(pool_connections=8, pool_maxsize=32, backoff_factor=0.2):
+    """
+    Create a pooled requests.Session with keep-alive and retries
+
+    Only idempotent requests (GET...) are retried on connection
+    errors and 429/5xx responses - ACR Cloud identifications are billed per
+    request. Once retries are exhausted the last response is returned, so
+    callers keep checking status_code.
+
+    Read errors and read timeouts are not retried (read=False): the
+    original exception is re-raised, so callers still see requests' Timeout
+    after a single attempt instead of a ConnectionError after 4 x timeout.
+    """
+    retry = Retry(
+        total=3,
+        read=False,
+        backoff_factor=backoff_factor,
+        status_forcelist=[429, 500, 502, 503, 504],
+        raise_on_status=False
+    )
+    adapter = HTTPAdapter(
+        pool_connections=pool_connections,
+        pool_maxsize=pool_maxsize,
+        max_retries=retry
+    )
+
+    session = requests.Session()
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
@@ -0,0 +1,41 @@
+import os
+import logging
+
+logger = logging.getLogger(__name__)
+
+_client = None
+_initialized = False
+
+
+def get_redis():
+    """
+    Get the shared Redis client configured by REDIS_URL
+
+    Returns None when REDIS_URL is not set or Redis is unreachable,
+    so callers can fall back to in-memory caching.
+    """
+    global _client, _initialized
+
+    if _initialized:
+        return _client
+
+    _initialized = True
+    redis_url = os.getenv("REDIS_URL")
+
+    if not redis_url:
+        logger.info("ℹ️ REDIS_URL not set - using in-memory caches")
+        return None
+
+    # Imported here: redis-py is the heaviest import of the app and is
+    # only needed when Redis is configured
+    import redis
+
+    try:
+        client = redis.Redis.from_url(redis_url, socket_timeout=2, socket_connect_timeout=2)
+        client.ping()
+        _client = client
+        logger.info("✅ Redis connected")
+    except Exception as e:
+        logger.warning(f"⚠️ Redis unavailable, using in-memory caches: {str(e)}")
+
+    return _client
@@ -0,0 +1,82 @@
+import logging
+import threading
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from cachetools import TTLCache
+
+logger = logging.getLogger(__name__)
+
+
+class ScanTaskService:
+    """
+    Runs scans in the background and keeps track of their progress
+
+    Tasks live in process memory: a task can only be polled on the
+    worker that created it. At most max_workers scans run at once, the
+    others stay 'queued' until a slot frees up.
+    """
+
+    def __init__(self, max_workers=4):
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='scan')
+
+        # Finished tasks are kept 1h for polling
+        self._tasks = TTLCache(maxsize=1000, ttl=3600)
+        self._lock = threading.Lock()
+
+    def submit(self, func, *args):
+        """
+        Run func(*args, on_progress=callback) in the background
+
+        func must return a (result_dict, status_code) tuple
+
+        Returns:
+            task_id (str)
+        """
+        task_id = uuid.uuid4().hex
+
+        with self._lock:
+            self._tasks[task_id] = {
+                'status': 'queued',
+                'progress': 0.0,
+                'result': None
+            }
+
+        def on_progress(progress):
+            self._update(task_id, progress=progress)
+
+        def run():
+            self._update(task_id, status='running')
+            try:
+                result, _ = func(*args, on_progress=on_progress)
+                status = 'completed' if result.get('success') else 'failed'
+                self._update(task_id, status=status, progress=1.0, result=result)
+            except Exception as e:
+                logger.error(f"❌ Task {task_id} failed: {str(e)}", exc_info=True)
+                self._update(task_id, status='failed', result={
+                    'success': False,
+                    'error': 'internal_error',
+                    'message': 'Internal server error'
+                })
+
+        self.executor.submit(run)
+        logger.info(f"🧵 Task {task_id} queued")
+
+        return task_id
+
+    def _update(self, task_id, **fields):
+        with self._lock:
+            task = self._tasks.get(task_id)
+            if task is not None:
+                task.update(fields)
+
+    def get(self, task_id):
+        """
+        Get task state
+
+        Returns:
+            {'status': 'queued'|'running'|'completed'|'failed', 'progress': float, 'result': dict|None}
+            or None if the task is unknown or expired
+        """
+        with self._lock:
+            task = self._tasks.get(task_id)
+            return dict(task) if task is not None else None
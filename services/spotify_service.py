@@ -1,7 +1,13 @@
 import os
 import logging
-import requests
+import orjson
 import base64
+import threading
+import uuid
+from cachetools import TTLCache
+from concurrent.futures import ThreadPoolExecutor
+from services.http_session import create_session
+from services.redis_client import get_redis
 
 logger = logging.getLogger(__name__)
 
@@ -9,11 +15,33 @@ logger = logging.getLogger(__name__)
 class SpotifyService:
     """Service to enrich track metadata using Spotify API"""
 
+    # Redis keys for the token shared between workers
+    TOKEN_KEY = "spotify:token"
+    TOKEN_LOCK_KEY = "spotify:token:lock"
+    
+    # Delete the lock only if it still holds our value (it may have expired
+    # during a slow refresh and been taken by another worker)
+    RELEASE_LOCK_SCRIPT = """
+    if redis.call('get', KEYS[1]) == ARGV[1] then
+        return redis.call('del', KEYS[1])
+    end
+    return 0
+    """
+
     def __init__(self):
         self.client_id = os.getenv("SPOTIFY_CLIENT_ID")
         self.client_secret = os.getenv("SPOTIFY_CLIENT_SECRET")
         self.token = None
         self.token_expires_at = 0
+        self.redis = get_redis()
+        
+        # Shared session so TCP+TLS connections are reused across calls
+        self.session = create_session()
+        
+        # Track details cache (24h) - popular samples come back across scans
+        # Only the formatted details are kept: raw track objects weigh ~28 KB each
+        self._track_cache = TTLCache(maxsize=10_000, ttl=86400)
+        self._track_cache_lock = threading.Lock()
         
         if all([self.client_id, self.client_secret]):
             logger.info("✅ Spotify credentials configured")
@@ -28,13 +56,25 @@ class SpotifyService:
         if self.token and time.time() < self.token_expires_at:
             return self.token
         
+        # Another worker may already have refreshed it
+        if self._load_shared_token():
+            return self.token
+        
+        # Only one worker refreshes during a stampede, others wait for its token
+        lock_value = self._acquire_refresh_lock()
+        if lock_value is False:
+            for _ in range(25):
+                time.sleep(0.2)
+                if self._load_shared_token():
+                    return self.token
+        
         try:
             # Encode credentials
             credentials = f"{self.client_id}:{self.client_secret}"
             credentials_b64 = base64.b64encode(credentials.encode()).decode()
             
             # Request token
-            response = requests.post(
+            response = self.session.post(
                 "https://accounts.spotify.com/api/token",
                 headers={
                     "Authorization": f"Basic {credentials_b64}",
@@ -48,10 +88,11 @@ class SpotifyService:
                 logger.error(f"❌ Failed to get Spotify token: {response.status_code}")
                 return None
             
-            data = response.json()
+            data = orjson.loads(response.content)
             self.token = data.get('access_token')
             expires_in = data.get('expires_in', 3600)
             self.token_expires_at = time.time() + expires_in - 60  # Refresh 1 min early
+            self._store_shared_token(expires_in - 60)
             
             logger.info("✅ Spotify token refreshed")
             return self.token
@@ -59,81 +100,216 @@ class SpotifyService:
         except Exception as e:
             logger.error(f"❌ Error getting Spotify token: {str(e)}")
             return None
+        
+        finally:
+            if lock_value:
+                self._release_refresh_lock(lock_value)
 
-    def _get_track_details(self, spotify_id):
+    def _load_shared_token(self):
+        """Load the token shared in Redis into memory, returns True if found"""
+        import time
+        
+        if not self.redis:
+            return False
+        
+        try:
+            pipe = self.redis.pipeline()
+            pipe.get(self.TOKEN_KEY)
+            pipe.ttl(self.TOKEN_KEY)
+            token, ttl = pipe.execute()
+            
+            if not token or ttl <= 0:
+                return False
+            
+            self.token = token.decode()
+            self.token_expires_at = time.time() + ttl
+            return True
+            
+        except Exception as e:
+            logger.warning(f"⚠️ Redis error reading Spotify token: {str(e)}")
+            return False
+
+    def _store_shared_token(self, ttl):
+        """Share the token with other workers through Redis"""
+        if not self.redis or not self.token or ttl <= 0:
+            return
+        
+        try:
+            self.redis.setex(self.TOKEN_KEY, int(ttl), self.token)
+        except Exception as e:
+            logger.warning(f"⚠️ Redis error storing Spotify token: {str(e)}")
+
+    def _acquire_refresh_lock(self):
         """
-        Get track details from Spotify API
+        Take the Redis refresh lock (SET NX)
+        
+        Returns:
+            The lock value (needed to release it) if acquired, False if
+            another worker holds it, None if Redis is not available
+            (refresh without lock)
+        """
+        if not self.redis:
+            return None
+        
+        lock_value = uuid.uuid4().hex
+        
+        try:
+            if self.redis.set(self.TOKEN_LOCK_KEY, lock_value, nx=True, ex=10):
+                return lock_value
+            return False
+        except Exception as e:
+            logger.warning(f"⚠️ Redis error acquiring token lock: {str(e)}")
+            return None
+
+    def _release_refresh_lock(self, lock_value):
+        try:
+            self.redis.eval(self.RELEASE_LOCK_SCRIPT, 1, self.TOKEN_LOCK_KEY, lock_value)
+        except Exception as e:
+            logger.warning(f"⚠️ Redis error releasing token lock: {str(e)}")
+
+    def _get_tracks_bulk(self, ids):
+        """
+        Get track details from Spotify API using the bulk endpoint
         
         Args:
-            spotify_id: 'spotify:track:xxx' or just the track ID
+            ids: List of Spotify track IDs (without the spotify:track: prefix)
         
         Returns:
-            {
-                'spotify_url': str,
-                'cover_url': str,
-                'release_date': str,
-                'label': str
-            }
+            {track_id: details} for every track Spotify returned
+            (see _format_track_details)
         """
-        # Extract track ID from spotify:track:xxx format
-        if spotify_id.startswith('spotify:track:'):
-            track_id = spotify_id.split(':')[2]
-        else:
-            track_id = spotify_id
+        if not ids:
+            return {}
+        
+        # Serve cached details from memory
+        tracks = {}
+        with self._track_cache_lock:
+            for track_id in ids:
+                track = self._track_cache.get(track_id)
+                if track is not None:
+                    tracks[track_id] = track
+        
+        missing = list(dict.fromkeys(track_id for track_id in ids if track_id not in tracks))
+        if not missing:
+            return tracks
         
         token = self._get_token()
         if not token:
-            return {}
+            return tracks
+        
+        # /v1/tracks accepts up to 50 IDs per call
+        chunks = [missing[i:i + 50] for i in range(0, len(missing), 50)]
+        
+        if len(chunks) == 1:
+            results = [self._fetch_tracks_chunk(chunks[0], token)]
+        else:
+            # Fire chunk requests concurrently (pure I/O wait)
+            with ThreadPoolExecutor(max_workers=min(len(chunks), 16)) as executor:
+                results = list(executor.map(lambda chunk: self._fetch_tracks_chunk(chunk, token), chunks))
+        
+        with self._track_cache_lock:
+            for result in results:
+                self._track_cache.update(result)
+                tracks.update(result)
         
+        return tracks
+
+    def _fetch_tracks_chunk(self, chunk, token):
+        """Fetch up to 50 tracks in a single /v1/tracks call, returns formatted details"""
         try:
-            response = requests.get(
-                f"https://api.spotify.com/v1/tracks/{track_id}",
+            response = self.session.get(
+                "https://api.spotify.com/v1/tracks",
+                params={"ids": ",".join(chunk)},
                 headers={"Authorization": f"Bearer {token}"},
                 timeout=10
             )
             
             if response.status_code != 200:
-                logger.warning(f"⚠️ Spotify API error for track {track_id}: {response.status_code}")
+                logger.warning(f"⚠️ Spotify API error for {len(chunk)} tracks: {response.status_code}")
                 return {}
             
-            data = response.json()
-            
-            # Extract album info
-            album = data.get('album', {})
-            images = album.get('images', [])
-            
-            # Get cover image (300x300 preferred)
-            cover_url = ''
-            if images:
-                # Try to find 300x300 image
-                for img in images:
-                    if img.get('height') == 300:
-                        cover_url = img.get('url', '')
-                        break
-                # Fallback to first image
-                if not cover_url:
-                    cover_url = images[0].get('url', '')
-            
-            # Get label
-            label = album.get('label', '')
-            
-            # Get release date
-            release_date = album.get('release_date', '')
-            
-            # Build Spotify URL
-            spotify_url = f"https://open.spotify.com/track/{track_id}"
-            
+            # Unknown IDs come back as null entries
             return {
-                'spotify_url': spotify_url,
-                'cover_url': cover_url,
-                'release_date': release_date,
-                'label': label
+                track['id']: self._format_track_details(track['id'], track)
+                for track in orjson.loads(response.content).get('tracks', [])
+                if track and track.get('id')
             }
             
         except Exception as e:
-            logger.warning(f"⚠️ Error getting track details: {str(e)}")
+            logger.warning(f"⚠️ Error getting tracks details: {str(e)}")
             return {}
 
+    def _extract_track_id(self, spotify_id):
+        """Extract track ID from spotify:track:xxx format"""
+        if spotify_id.startswith('spotify:track:'):
+            return spotify_id.split(':')[2]
+        return spotify_id
+
+    def _format_track_details(self, track_id, data):
+        """
+        Build the details dict from a Spotify track object
+        
+        Returns:
+            {
+                'spotify_url': str,
+                'cover_url': str,
+                'release_date': str,
+                'label': str
+            }
+        """
+        if not data:
+            return {}
+        
+        # Extract album info
+        album = data.get('album', {})
+        images = album.get('images', [])
+        
+        # Get cover image (300x300 preferred)
+        cover_url = ''
+        if images:
+            # Try to find 300x300 image
+            for img in images:
+                if img.get('height') == 300:
+                    cover_url = img.get('url', '')
+                    break
+            # Fallback to first image
+            if not cover_url:
+                cover_url = images[0].get('url', '')
+        
+        # Get label
+        label = album.get('label', '')
+        
+        # Get release date
+        release_date = album.get('release_date', '')
+        
+        # Build Spotify URL
+        spotify_url = f"https://open.spotify.com/track/{track_id}"
+        
+        return {
+            'spotify_url': spotify_url,
+            'cover_url': cover_url,
+            'release_date': release_date,
+            'label': label
+        }
+
+    def _get_track_details(self, spotify_id):
+        """
+        Get track details from Spotify API
+        
+        Args:
+            spotify_id: 'spotify:track:xxx' or just the track ID
+        
+        Returns:
+            {
+                'spotify_url': str,
+                'cover_url': str,
+                'release_date': str,
+                'label': str
+            }
+        """
+        track_id = self._extract_track_id(spotify_id)
+        return self._get_tracks_bulk([track_id]).get(track_id, {})
+
     def enrich_tracks(self, matches):
         """
         Enrich ACR Cloud matches with Spotify metadata
@@ -147,27 +323,19 @@ class SpotifyService:
         if not matches:
             return []
         
-        enriched = []
+        # No Spotify ID -> basic info only
+        track_ids = [
+            self._extract_track_id(match['spotify_id']) if match.get('spotify_id') else None
+            for match in matches
+        ]
         
-        for match in matches:
-            spotify_id = match.get('spotify_id', '')
-            
-            if not spotify_id:
-                # No Spotify ID, return basic info
-                enriched.append({
-                    'title': match['title'],
-                    'artists': match['artists'],
-                    'spotify_url': '',
-                    'cover_url': '',
-                    'release_date': '',
-                    'label': '',
-                    'score': match['score']
-                })
-                continue
-            
-            # Get Spotify details
-            details = self._get_track_details(spotify_id)
-            
+        # Deduplicate IDs (ACR often returns the same track several times)
+        # then fetch them all at once (1 request per 50 IDs)
+        details_map = self._get_tracks_bulk(list(dict.fromkeys(filter(None, track_ids))))
+        
+        enriched = []
+        for match, track_id in zip(matches, track_ids):
+            details = details_map.get(track_id, {})
             enriched.append({
                 'title': match['title'],
                 'artists': match['artists'],
@@ -1,29 +1,123 @@
 import os
 import logging
+import functools
+import orjson
 import tempfile
+import shutil
 import subprocess
 import re
+import random
 import requests
 import time
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from cachetools import TTLCache
+from services.http_session import create_session
+from services.redis_client import get_redis
 
 logger = logging.getLogger(__name__)
 
+# Background metadata lookups (get_video_info_lazy)
+_EXECUTOR = ThreadPoolExecutor(max_workers=4, thread_name_prefix='youtube')
+
+# Video ID in watch/embed/shorts URLs, youtu.be links, or a bare ID - single pass
+_VIDEO_ID_RE = re.compile(r'(?:v=|\/|youtu\.be\/)([0-9A-Za-z_-]{11})|^([0-9A-Za-z_-]{11})$')
+
+
+# ISO 8601 duration as returned by contentDetails.duration (e.g. PT3M25S, P1DT2H)
+_ISO_DURATION_RE = re.compile(r'^P(?:(\d+)D)?(?:T(?:(\d+)H)?(?:(\d+)M)?(?:(\d+)S)?)?$')
+
+
+def _parse_iso_duration(duration):
+    """Convert an ISO 8601 duration to seconds (0 if missing/invalid)"""
+    match = _ISO_DURATION_RE.match(duration or '')
+    if not match:
+        return 0
+    days, hours, minutes, seconds = (int(g) if g else 0 for g in match.groups())
+    return ((days * 24 + hours) * 60 + minutes) * 60 + seconds
+
+
+@functools.lru_cache(maxsize=512)
+def _extract_cached(url):
+    """Video ID for a URL - cached, each scan parses the same URL several times"""
+    match = _VIDEO_ID_RE.search(url)
+    return (match.group(1) or match.group(2)) if match else None
+
 
 class YouTubeService:
     """
     YouTube service using:
     1. YouTube Data API v3 for metadata
-    2. Apify Actor (marielise.dev~youtube-video-downloader) for MP3 download
+    2. yt-dlp (when installed), then Apify Actor (marielise.dev~youtube-video-downloader) for MP3 download
     """
 
+    # Clip sent to ACR Cloud: 30 seconds starting at 15s
+    CLIP_START = 15
+    CLIP_DURATION = 30
+
+    # Bytes needed to cover the first 45s even at 320 kbps, plus room for ID3 tags / cover art
+    MAX_DOWNLOAD_BYTES = (CLIP_START + CLIP_DURATION) * 320_000 // 8 + 256 * 1024
+
+    # FFmpeg codec arguments: remux MP3 as-is, re-encode anything else
+    COPY_CODEC_ARGS = ['-acodec', 'copy']
+    ENCODE_CODEC_ARGS = ['-acodec', 'libmp3lame', '-b:a', '128k']
+
+    # Clip cache TTL (7 days) and size cap (~1000 clips), oldest clips are evicted first
+    CLIP_CACHE_TTL = 7 * 86400
+    CLIP_CACHE_MAX_BYTES = 500 * 1024 * 1024
+
+    # Download directories older than this were left behind by a killed worker
+    STALE_WORK_DIR_AGE = 3600
+
+    # Shared (Redis) metadata cache TTLs
+    INFO_CACHE_TTL = 6 * 3600
+    INFO_NEGATIVE_CACHE_TTL = 5 * 60
+
+    # Apify run polling - observed run time is 1m18s
+    APIFY_POLL_INTERVAL = 2
+    APIFY_POLL_MAX_INTERVAL = 10
+    APIFY_RUN_TIMEOUT = 180
+    APIFY_START_RETRIES = 3
+
+    # (connect, read) timeouts for the audio file, plus a total budget -
+    # the read timeout alone resets on every chunk of a slow-dripping CDN
+    AUDIO_TIMEOUT = (5, 30)
+    AUDIO_DOWNLOAD_DEADLINE = 120
+
     def __init__(self):
         self.temp_dir = tempfile.gettempdir()
         self.api_key = os.getenv("YOUTUBE_API_KEY")
         self.apify_token = os.getenv("APIFY_API_TOKEN")
         
-        # Apify Actor endpoint (marielise.dev - MP3 downloader)
+        # Extracted clips are deterministic per video: keep them to skip Apify + FFmpeg
+        # (point CLIP_CACHE_DIR to a persistent disk to keep them across deploys)
+        self.clip_cache_dir = os.getenv("CLIP_CACHE_DIR") or os.path.join(self.temp_dir, 'beatlink-clip-cache')
+        os.makedirs(self.clip_cache_dir, exist_ok=True)
+        self._clip_cache_lock = threading.Lock()
+        self._sweep_stale_files()
+        
+        # yt-dlp is tried before Apify when installed (free, no Apify run) - YTDLP_ENABLED=0 to disable
+        self.ytdlp_enabled = bool(shutil.which('yt-dlp')) and os.getenv("YTDLP_ENABLED", "1") != "0"
+        
+        # Shared session so TCP+TLS connections are reused across calls
+        # POST is only retried on connect errors here, see _start_apify_run
+        self.session = create_session(
+            pool_connections=10,
+            pool_maxsize=50,
+            backoff_factor=0.5
+        )
+        
+        # Video metadata cache (1h) - repeat scans of the same URL skip the API
+        self._info_cache = TTLCache(maxsize=5000, ttl=3600)
+        self._info_cache_lock = threading.Lock()
+        
+        # Shared metadata cache across workers/restarts (optional)
+        self.redis = get_redis()
+        
+        # Apify Actor (marielise.dev - MP3 downloader)
         # This actor is simpler and supports direct MP3 format
-        self.apify_endpoint = "https://api.apify.com/v2/acts/marielise.dev~youtube-video-downloader/run-sync-get-dataset-items"
+        self.apify_api = "https://api.apify.com/v2"
+        self.apify_actor = "marielise.dev~youtube-video-downloader"
         
         if self.api_key:
             logger.info("✅ YOUTUBE_API_KEY configured")
@@ -37,116 +131,341 @@ class YouTubeService:
         
         logger.info(f"📁 Temp directory: {self.temp_dir}")
         logger.info(f"🎬 Using Apify actor: marielise.dev~youtube-video-downloader")
+        logger.info(f"🎞️ yt-dlp: {'enabled' if self.ytdlp_enabled else 'disabled'}")
 
     def _extract_video_id(self, url):
         """Extract video ID from various YouTube URL formats"""
-        patterns = [
-            r'(?:v=|\/)([0-9A-Za-z_-]{11})',
-            r'youtu\.be\/([0-9A-Za-z_-]{11})',
-            r'^([0-9A-Za-z_-]{11})$'
-        ]
-        for pattern in patterns:
-            match = re.search(pattern, url)
-            if match:
-                return match.group(1)
-        return None
+        return _extract_cached(url)
 
     def get_video_info(self, youtube_url):
         """
         Fetch video metadata using YouTube Data API v3
         """
-        video_id = self._extract_video_id(youtube_url)
+        return self.get_videos_info([youtube_url])[youtube_url]
+
+    def get_video_info_lazy(self, youtube_url):
+        """
+        Start fetching video metadata in the background
         
-        if not video_id:
-            return {
-                'success': False,
-                'error': 'invalid_url',
-                'message': 'URL YouTube invalide'
-            }
+        For callers that may not need the metadata at all (e.g. fingerprinting
+        only needs download_audio): call .result() on the returned Future only
+        when the title/thumbnail is actually rendered.
+        
+        Returns:
+            concurrent.futures.Future resolving to the get_video_info dict
+        """
+        return _EXECUTOR.submit(self.get_video_info, youtube_url)
+
+    def get_videos_info(self, youtube_urls):
+        """
+        Fetch metadata for several videos using YouTube Data API v3
+        
+        videos.list accepts up to 50 IDs per call for the same 1 quota unit,
+        so N videos cost ceil(N/50) calls instead of N.
+        
+        Returns:
+            {youtube_url: video_info} - same dicts as get_video_info
+        """
+        results = {}
+        url_ids = {}
+        
+        for youtube_url in youtube_urls:
+            video_id = self._extract_video_id(youtube_url)
+            if not video_id:
+                results[youtube_url] = {
+                    'success': False,
+                    'error': 'invalid_url',
+                    'message': 'URL YouTube invalide'
+                }
+            else:
+                url_ids[youtube_url] = video_id
+        
+        if not url_ids:
+            return results
         
         if not self.api_key:
-            return {
-                'success': False,
-                'error': 'missing_api_key',
-                'message': 'YOUTUBE_API_KEY non configurée'
-            }
+            for youtube_url in url_ids:
+                results[youtube_url] = {
+                    'success': False,
+                    'error': 'missing_api_key',
+                    'message': 'YOUTUBE_API_KEY non configurée'
+                }
+            return results
+        
+        # Serve from memory / Redis caches, only fetch the rest
+        infos = {}
+        missing = []
         
+        for video_id in dict.fromkeys(url_ids.values()):
+            with self._info_cache_lock:
+                cached = self._info_cache.get(video_id)
+            if cached is not None:
+                logger.info(f"⚡ Metadata cache hit for video {video_id}")
+                infos[video_id] = cached
+                continue
+            
+            cached = self._get_shared_info(video_id)
+            if cached is not None:
+                logger.info(f"⚡ Metadata Redis hit for video {video_id}")
+                if cached['success']:
+                    with self._info_cache_lock:
+                        self._info_cache[video_id] = cached
+                infos[video_id] = cached
+                continue
+            
+            missing.append(video_id)
+        
+        for i in range(0, len(missing), 50):
+            infos.update(self._fetch_videos_info(missing[i:i + 50]))
+        
+        for youtube_url, video_id in url_ids.items():
+            results[youtube_url] = infos[video_id]
+        
+        return results
+
+    def _fetch_videos_info(self, video_ids):
+        """
+        Fetch metadata for up to 50 video IDs in a single videos.list call
+        
+        Returns:
+            {video_id: video_info}
+        """
         try:
-            logger.info(f"📋 Fetching metadata for video {video_id}...")
+            logger.info(f"📋 Fetching metadata for {len(video_ids)} video(s): {', '.join(video_ids)}...")
             
-            response = requests.get(
+            response = self.session.get(
                 "https://www.googleapis.com/youtube/v3/videos",
                 params={
-                    "id": video_id,
-                    "part": "snippet,statistics",
+                    "id": ",".join(video_ids),
+                    "part": "snippet,statistics,contentDetails",
+                    # Only what we read below - skips description, tags, localized...
+                    "fields": "items(id,snippet(title,channelTitle,thumbnails/maxres/url,thumbnails/high/url,thumbnails/medium/url,thumbnails/default/url),statistics/viewCount,contentDetails/duration)",
                     "key": self.api_key
                 },
+                # Google only compresses responses when the User-Agent contains "gzip"
+                headers={
+                    "Accept-Encoding": "gzip, br",
+                    "User-Agent": "beatlink/1.0 (gzip)"
+                },
                 timeout=15
             )
             
             if response.status_code != 200:
                 logger.error(f"❌ YouTube API error: {response.status_code}")
                 try:
-                    error_data = response.json()
+                    error_data = orjson.loads(response.content)
                     logger.error(f"Error details: {error_data}")
                 except:
                     logger.error(f"Response text: {response.text[:500]}")
-                return {
+                error = {
                     'success': False,
                     'error': 'api_error',
                     'message': f'YouTube API error: {response.status_code}'
                 }
+                return {video_id: error for video_id in video_ids}
             
-            data = response.json()
-            items = data.get('items', [])
+            data = orjson.loads(response.content)
+            items = {item.get('id'): item for item in data.get('items', [])}
             
-            if not items:
-                return {
-                    'success': False,
-                    'error': 'video_unavailable',
-                    'message': 'Vidéo introuvable, privée ou supprimée'
-                }
-            
-            snippet = items[0].get('snippet', {})
-            statistics = items[0].get('statistics', {})
-            thumbnails = snippet.get('thumbnails', {})
-            
-            # Get best quality thumbnail
-            thumbnail = ''
-            for quality in ('maxres', 'high', 'medium', 'default'):
-                if quality in thumbnails:
-                    thumbnail = thumbnails[quality].get('url', '')
-                    break
+            infos = {}
             
-            title = snippet.get('title', 'Unknown Title')
-            logger.info(f"✅ Metadata retrieved: {title[:60]}")
+            for video_id in video_ids:
+                item = items.get(video_id)
+                
+                if not item:
+                    unavailable = {
+                        'success': False,
+                        'error': 'video_unavailable',
+                        'message': 'Vidéo introuvable, privée ou supprimée'
+                    }
+                    # Short TTL so repeated scans of a deleted video don't all hit the API
+                    self._set_shared_info(video_id, unavailable, self.INFO_NEGATIVE_CACHE_TTL)
+                    infos[video_id] = unavailable
+                    continue
+                
+                snippet = item.get('snippet', {})
+                statistics = item.get('statistics', {})
+                thumbnails = snippet.get('thumbnails', {})
+                
+                # Get best quality thumbnail
+                thumbnail = ''
+                for quality in ('maxres', 'high', 'medium', 'default'):
+                    if quality in thumbnails:
+                        thumbnail = thumbnails[quality].get('url', '')
+                        break
+                
+                title = snippet.get('title', 'Unknown Title')
+                logger.info(f"✅ Metadata retrieved: {title[:60]}")
+                
+                info = {
+                    'success': True,
+                    'title': title,
+                    'author': snippet.get('channelTitle', 'Unknown Author'),
+                    'views': int(statistics.get('viewCount', 0)),
+                    'thumbnail': thumbnail,
+                    'duration': _parse_iso_duration(item.get('contentDetails', {}).get('duration', ''))
+                }
+                
+                with self._info_cache_lock:
+                    self._info_cache[video_id] = info
+                self._set_shared_info(video_id, info, self.INFO_CACHE_TTL)
+                
+                infos[video_id] = info
             
-            return {
-                'success': True,
-                'title': title,
-                'author': snippet.get('channelTitle', 'Unknown Author'),
-                'views': int(statistics.get('viewCount', 0)),
-                'thumbnail': thumbnail,
-                'duration': 0
-            }
+            return infos
             
         except requests.exceptions.Timeout:
             logger.error("❌ YouTube API timeout (15s)")
-            return {
+            error = {
                 'success': False,
                 'error': 'timeout',
                 'message': 'YouTube API timeout'
             }
+            return {video_id: error for video_id in video_ids}
             
         except Exception as e:
+            # str(e) contains the request URL (and the API key): log only
             logger.error(f"❌ Error fetching video info: {str(e)}", exc_info=True)
-            return {
+            error = {
                 'success': False,
                 'error': 'unknown_error',
-                'message': f'Error: {str(e)}'
+                'message': 'YouTube API request failed'
             }
+            return {video_id: error for video_id in video_ids}
+
+    def _get_shared_info(self, video_id):
+        """Get video metadata from Redis, None on miss or if Redis is not available"""
+        if not self.redis:
+            return None
+        
+        try:
+            cached = self.redis.get(f"yt:meta:{video_id}")
+            return orjson.loads(cached) if cached else None
+        except Exception as e:
+            logger.warning(f"⚠️ Redis error reading metadata: {str(e)}")
+            return None
+
+    def _set_shared_info(self, video_id, info, ttl):
+        """Store video metadata in Redis"""
+        if not self.redis:
+            return
+        
+        try:
+            self.redis.setex(f"yt:meta:{video_id}", ttl, orjson.dumps(info))
+        except Exception as e:
+            logger.warning(f"⚠️ Redis error storing metadata: {str(e)}")
+
+    def _run_apify_actor(self, payload):
+        """
+        Start an Apify Actor run and poll it until it finishes
+        
+        The run is started asynchronously (POST /acts/{actor}/runs) instead of
+        holding a connection open on run-sync-get-dataset-items, so the worker
+        only makes short requests while the actor works.
+        
+        Returns:
+            List of dataset items, or None on failure
+        """
+        params = {"token": self.apify_token}
+        
+        response = self._start_apify_run(payload, params)
+        
+        logger.info(f"📥 Apify response status: {response.status_code}")
+        
+        if response.status_code != 200 and response.status_code != 201:
+            logger.error(f"❌ Apify API error: {response.status_code}")
+            logger.error(f"Response: {response.text[:1000]}")
+            return None
+        
+        run = orjson.loads(response.content).get('data', {})
+        run_id = run.get('id')
+        status = run.get('status')
+        
+        if not run_id:
+            logger.error(f"❌ No run ID in Apify response: {response.text[:500]}")
+            return None
+        
+        logger.info(f"🏃 Apify run started: {run_id}")
+        
+        deadline = time.time() + self.APIFY_RUN_TIMEOUT
+        attempt = 0
+        
+        while status in (None, 'READY', 'RUNNING'):
+            if time.time() > deadline:
+                logger.error(f"❌ Apify run timeout ({self.APIFY_RUN_TIMEOUT}s) - Actor may be slow or stuck")
+                # Stop the run so it doesn't keep burning credits
+                try:
+                    self.session.post(f"{self.apify_api}/actor-runs/{run_id}/abort", params=params, timeout=10)
+                except Exception as e:
+                    logger.warning(f"⚠️ Failed to abort Apify run: {str(e)}")
+                return None
+            
+            # Exponential backoff (2s -> 10s) with jitter so concurrent scans don't poll in lockstep
+            delay = min(self.APIFY_POLL_INTERVAL * 1.5 ** attempt, self.APIFY_POLL_MAX_INTERVAL)
+            delay += random.uniform(0, 1)
+            time.sleep(max(0, min(delay, deadline - time.time())))
+            attempt += 1
+            
+            try:
+                response = self.session.get(
+                    f"{self.apify_api}/actor-runs/{run_id}",
+                    params=params,
+                    timeout=15
+                )
+            except requests.exceptions.RequestException as e:
+                # The run keeps going on Apify's side, just poll again
+                logger.warning(f"⚠️ Apify run status request failed: {str(e)}")
+                continue
+            
+            if response.status_code != 200:
+                logger.warning(f"⚠️ Apify run status error: {response.status_code}")
+                continue
+            
+            status = orjson.loads(response.content).get('data', {}).get('status')
+        
+        if status != 'SUCCEEDED':
+            logger.error(f"❌ Apify run {run_id} ended with status {status}")
+            return None
+        
+        logger.info(f"✅ Apify run {run_id} succeeded")
+        
+        response = self.session.get(
+            f"{self.apify_api}/actor-runs/{run_id}/dataset/items",
+            params=params,
+            timeout=30
+        )
+        
+        if response.status_code != 200:
+            logger.error(f"❌ Apify dataset error: {response.status_code}")
+            logger.error(f"Response: {response.text[:1000]}")
+            return None
+        
+        return orjson.loads(response.content)
+
+    def _start_apify_run(self, payload, params):
+        """
+        POST the run request, retrying only on 429
+        
+        A 429 means Apify rejected the request before creating the run. A 5xx
+        from a gateway (502/504) or a read timeout may come after the billed
+        run was created, so those are not retried.
+        """
+        for attempt in range(self.APIFY_START_RETRIES + 1):
+            response = self.session.post(
+                f"{self.apify_api}/acts/{self.apify_actor}/runs",
+                params=params,
+                json=payload,
+                timeout=(5, 30)
+            )
+            
+            if response.status_code != 429 or attempt == self.APIFY_START_RETRIES:
+                return response
+            
+            delay = 0.5 * 2 ** attempt + random.uniform(0, 0.5)
+            logger.warning(f"⚠️ Apify rate limit (429), retrying in {delay:.1f}s")
+            time.sleep(delay)
 
-    def download_audio(self, youtube_url):
+    def download_audio(self, youtube_url, on_clip_ready=None):
         """
         Download audio using Apify Actor (marielise.dev~youtube-video-downloader)
         
@@ -155,18 +474,47 @@ class YouTubeService:
         - Simple input format (just format + urls)
         - Cost: ~$0.00006 per download
         
-        After download, we extract 30 seconds with FFmpeg for ACR Cloud
+        The download is piped into FFmpeg, which extracts 30 seconds for ACR Cloud
+        
+        Fingerprint-only callers should use this directly: no YouTube Data API
+        call is made (see fetch_all / get_video_info_lazy when metadata is needed)
+        
+        Args:
+            youtube_url: YouTube video URL
+            on_clip_ready: Optional callback receiving the clip path as soon as
+                           FFmpeg has written it (e.g. to start identification)
+        """
+        mp3_path, _ = self._download_clip(youtube_url, on_clip_ready)
+        return mp3_path
+
+    def _download_clip(self, youtube_url, on_clip_ready=None):
+        """
+        Get the 30s clip: clip cache, then yt-dlp, then Apify (see download_audio)
+        
+        Returns:
+            (mp3_path, apify_result) - mp3_path is None on failure, apify_result
+            is the dataset item when the actor returned one
         """
         video_id = self._extract_video_id(youtube_url) or 'unknown'
         
-        # Clean up any existing files
-        for ext in ('webm', 'm4a', 'mp4', 'mp3', 'wav'):
-            f = os.path.join(self.temp_dir, f'beatlink_{video_id}.{ext}')
-            if os.path.exists(f):
-                os.remove(f)
-            f_raw = os.path.join(self.temp_dir, f'beatlink_{video_id}_raw.{ext}')
-            if os.path.exists(f_raw):
-                os.remove(f_raw)
+        # Fresh directory per download: nothing stale to clean up, and concurrent
+        # scans of the same video don't overwrite each other's files
+        work_dir = tempfile.mkdtemp(prefix=f'beatlink_{video_id}_', dir=self.temp_dir)
+        mp3_path = os.path.join(work_dir, 'clip.mp3')
+        clip_ready = False
+        
+        if video_id != 'unknown' and self._get_cached_clip(video_id, mp3_path):
+            logger.info(f"⚡ Clip cache hit for video {video_id}")
+            if on_clip_ready:
+                on_clip_ready(mp3_path)
+            return mp3_path, None
+        
+        if self.ytdlp_enabled and self._download_with_ytdlp(youtube_url, work_dir, mp3_path):
+            if video_id != 'unknown':
+                self._store_cached_clip(video_id, mp3_path)
+            if on_clip_ready:
+                on_clip_ready(mp3_path)
+            return mp3_path, None
         
         try:
             logger.info(f"🎵 Downloading audio for {video_id} via Apify (marielise.dev)...")
@@ -182,33 +530,19 @@ class YouTubeService:
                 ]
             }
             
-            logger.info("🚀 Calling Apify Actor (synchronous - may take ~1-2 minutes)...")
+            logger.info("🚀 Starting Apify Actor run (may take ~1-2 minutes)...")
             logger.info(f"📤 Input: {payload}")
             
-            # Call Apify with token in query parameter
-            # Timeout: 180s (3 minutes) - observed time is 1m18s, so this gives margin
-            response = requests.post(
-                self.apify_endpoint,
-                params={"token": self.apify_token},
-                json=payload,
-                timeout=180
-            )
-            
-            logger.info(f"📥 Apify response status: {response.status_code}")
-            
-            if response.status_code != 200 and response.status_code != 201:
-                logger.error(f"❌ Apify API error: {response.status_code}")
-                logger.error(f"Response: {response.text[:1000]}")
-                return None
+            results = self._run_apify_actor(payload)
             
-            # Parse dataset items response
-            results = response.json()
+            if results is None:
+                return None, None
             
             logger.info(f"📊 Received {len(results) if isinstance(results, list) else 'non-list'} results")
             
             if not results or len(results) == 0:
                 logger.error("❌ No results from Apify Actor")
-                return None
+                return None, None
             
             # Get first result
             result = results[0]
@@ -244,89 +578,491 @@ class YouTubeService:
                 logger.error(f"❌ No download URL found in result.")
                 logger.error(f"Available fields: {list(result.keys())}")
                 logger.error(f"Result content (first 500 chars): {str(result)[:500]}")
-                return None
+                return None, result
             
             logger.info(f"✅ Got download URL from Apify: {download_url[:100]}...")
             
-            # Download MP3 file from Apify URL
-            logger.info(f"⬇️ Downloading MP3 file from Apify URL...")
+            # OPTIMIZATION: Extract only 30 seconds for ACR Cloud
+            # ACR Cloud doesn't need the full track, 30 seconds is enough for fingerprinting
+            # This saves on ACR Cloud processing and data transfer
+            logger.info("🔄 Extracting 30 seconds (optimized for ACR Cloud)...")
             
-            audio_response = requests.get(download_url, timeout=120, stream=True)
+            if not self._extract_clip(download_url, mp3_path):
+                return None, result
             
-            if audio_response.status_code != 200:
-                logger.error(f"❌ Failed to download audio: {audio_response.status_code}")
-                return None
+            if os.path.exists(mp3_path):
+                size_kb = os.path.getsize(mp3_path) // 1024
+                logger.info(f"✅ MP3 ready: {mp3_path} ({size_kb} KB) - Optimized 30s extract")
+                clip_ready = True
+                if video_id != 'unknown':
+                    self._store_cached_clip(video_id, mp3_path)
+                if on_clip_ready:
+                    on_clip_ready(mp3_path)
+                return mp3_path, result
             
-            # Save raw MP3 file (full length from Apify)
-            raw_path = os.path.join(self.temp_dir, f'beatlink_{video_id}_raw.mp3')
+            logger.error("❌ MP3 file not found after extraction")
+            return None, result
             
-            with open(raw_path, 'wb') as f:
-                for chunk in audio_response.iter_content(chunk_size=8192):
-                    if chunk:
-                        f.write(chunk)
+        except requests.exceptions.Timeout:
+            logger.error("❌ Apify request timeout")
+            return None, None
             
-            file_size_kb = os.path.getsize(raw_path) // 1024
-            logger.info(f"✅ MP3 downloaded: {raw_path} ({file_size_kb} KB)")
+        except Exception as e:
+            logger.error(f"❌ Download error: {str(e)}", exc_info=True)
+            return None, None
+        
+        finally:
+            if not clip_ready:
+                shutil.rmtree(work_dir, ignore_errors=True)
+
+    def _sweep_stale_files(self):
+        """
+        Remove leftovers at startup with one directory scan each
+        
+        - beatlink_* download directories abandoned by a killed worker
+        - expired / over-cap clips and interrupted .tmp writes in the clip cache
+        """
+        now = time.time()
+        removed = 0
+        
+        try:
+            with os.scandir(self.temp_dir) as entries:
+                for entry in entries:
+                    if (entry.name.startswith('beatlink_') and entry.is_dir(follow_symlinks=False)
+                            and now - entry.stat().st_mtime > self.STALE_WORK_DIR_AGE):
+                        shutil.rmtree(entry.path, ignore_errors=True)
+                        removed += 1
+        except OSError as e:
+            logger.warning(f"⚠️ Temp files sweep failed: {str(e)}")
+        
+        removed += self._prune_clip_cache()
+        
+        if removed:
+            logger.info(f"🗑️ Removed {removed} stale temp file(s)")
+
+    def _prune_clip_cache(self):
+        """
+        Keep the clip cache within CLIP_CACHE_TTL and CLIP_CACHE_MAX_BYTES
+        
+        Runs at startup and after each store (one scandir, a few ms for ~1000
+        clips), so a long-running instance never grows the cache unbounded.
+        
+        Returns:
+            Number of files removed
+        """
+        # Another scan is already pruning, no need to do it twice
+        if not self._clip_cache_lock.acquire(blocking=False):
+            return 0
+        
+        now = time.time()
+        removed = 0
+        clips = []
+        
+        def unlink(path):
+            nonlocal removed
+            try:
+                os.unlink(path)
+                removed += 1
+            except OSError:
+                pass
+        
+        try:
+            with os.scandir(self.clip_cache_dir) as entries:
+                for entry in entries:
+                    stat = entry.stat()
+                    age = now - stat.st_mtime
+                    if entry.name.endswith('.tmp'):
+                        if age > self.STALE_WORK_DIR_AGE:
+                            unlink(entry.path)
+                    elif age > self.CLIP_CACHE_TTL:
+                        unlink(entry.path)
+                    else:
+                        clips.append((stat.st_mtime, stat.st_size, entry.path))
             
-            # OPTIMIZATION: Extract only 30 seconds for ACR Cloud
-            # ACR Cloud doesn't need the full track, 30 seconds is enough for fingerprinting
-            # This saves on ACR Cloud processing and data transfer
-            mp3_path = os.path.join(self.temp_dir, f'beatlink_{video_id}.mp3')
+            total = sum(size for _, size, _ in clips)
+            if total > self.CLIP_CACHE_MAX_BYTES:
+                for _, size, path in sorted(clips):
+                    unlink(path)
+                    total -= size
+                    if total <= self.CLIP_CACHE_MAX_BYTES:
+                        break
+        except OSError as e:
+            logger.warning(f"⚠️ Clip cache prune failed: {str(e)}")
+        finally:
+            self._clip_cache_lock.release()
+        
+        return removed
+
+    def _download_with_ytdlp(self, youtube_url, work_dir, mp3_path):
+        """
+        Download the clip locally with yt-dlp
+        
+        --download-sections fetches only the 15-45s range (HTTP Range), so
+        yt-dlp produces the clip directly: no Apify run, no separate FFmpeg cut.
+        Fails on YouTube rate-limits / bot checks, the caller then uses Apify.
+        
+        Returns:
+            True if the clip was written to mp3_path
+        """
+        logger.info("🎵 Downloading clip with yt-dlp...")
+        
+        clip_start = self.CLIP_START
+        clip_end = self.CLIP_START + self.CLIP_DURATION
+        
+        try:
+            ytdlp_result = subprocess.run(
+                [
+                    'yt-dlp',
+                    '--no-playlist',
+                    '--quiet',
+                    '-f', 'bestaudio[abr<=128]/bestaudio',
+                    '--download-sections', f'*{clip_start}-{clip_end}',
+                    '--extract-audio',
+                    '--audio-format', 'mp3',
+                    '--audio-quality', '128K',
+                    '-o', os.path.join(work_dir, 'ytdlp.%(ext)s'),
+                    youtube_url
+                ],
+                capture_output=True,
+                text=True,
+                timeout=90
+            )
+        except subprocess.TimeoutExpired:
+            logger.warning("⚠️ yt-dlp timeout (90s), falling back to Apify")
+            return False
+        
+        ytdlp_path = os.path.join(work_dir, 'ytdlp.mp3')
+        
+        if ytdlp_result.returncode != 0 or not os.path.exists(ytdlp_path):
+            logger.warning(f"⚠️ yt-dlp failed, falling back to Apify: {ytdlp_result.stderr[-300:]}")
+            return False
+        
+        os.replace(ytdlp_path, mp3_path)
+        return True
+
+    def _has_cached_clip(self, video_id):
+        """True if a fresh clip for video_id is in the clip cache"""
+        cache_path = os.path.join(self.clip_cache_dir, f'{video_id}.mp3')
+        
+        try:
+            return time.time() - os.path.getmtime(cache_path) <= self.CLIP_CACHE_TTL
+        except OSError:
+            return False
+
+    def _get_cached_clip(self, video_id, mp3_path):
+        """
+        Copy the cached clip for video_id to mp3_path
+        
+        The caller gets its own copy (hard link when possible) so cleanup_audio
+        never touches the cache.
+        
+        Returns:
+            True on cache hit
+        """
+        cache_path = os.path.join(self.clip_cache_dir, f'{video_id}.mp3')
+        
+        try:
+            if time.time() - os.path.getmtime(cache_path) > self.CLIP_CACHE_TTL:
+                os.remove(cache_path)
+                return False
             
-            logger.info("🔄 Extracting 30 seconds (optimized for ACR Cloud)...")
+            try:
+                os.link(cache_path, mp3_path)
+            except OSError:
+                shutil.copyfile(cache_path, mp3_path)
+            return True
             
-            # Use FFmpeg to extract 30 seconds starting from 15s mark
-            # -ss 15: Start at 15 seconds (skip potential intro/silence)
-            # -t 30: Extract 30 seconds duration
-            # -acodec copy: Copy codec without re-encoding (faster, no quality loss)
+        except OSError:
+            return False
+
+    def _store_cached_clip(self, video_id, mp3_path):
+        """Store a freshly extracted clip in the clip cache"""
+        cache_path = os.path.join(self.clip_cache_dir, f'{video_id}.mp3')
+        tmp_path = f'{cache_path}.{os.getpid()}.{threading.get_ident()}.tmp'
+        
+        try:
+            # Write under a temp name then rename, readers never see a partial file
+            try:
+                os.link(mp3_path, tmp_path)
+            except OSError:
+                shutil.copyfile(mp3_path, tmp_path)
+            os.replace(tmp_path, cache_path)
+        except OSError as e:
+            logger.warning(f"⚠️ Failed to cache clip: {str(e)}")
+            try:
+                os.remove(tmp_path)
+            except OSError:
+                pass
+            return
+        
+        self._prune_clip_cache()
+
+    def _extract_clip(self, download_url, mp3_path):
+        """
+        Extract the clip from the Apify file
+        
+        Fast path: FFmpeg seeks in the remote file and only fetches the clip
+        Fallback: download the beginning of the file and pipe it into FFmpeg
+        
+        Each is tried with a pure MP3 copy first (~50x faster than encoding).
+        Apify is asked for MP3, so copy nearly always works; if FFmpeg fails
+        (e.g. AAC/Opus can't be copied into an .mp3) the clip is re-encoded.
+        
+        Returns:
+            True if the clip was written
+        """
+        for extract in (self._extract_clip_from_url, self._extract_clip_from_stream):
+            for codec_args in (self.COPY_CODEC_ARGS, self.ENCODE_CODEC_ARGS):
+                if extract(download_url, mp3_path, codec_args):
+                    return True
+        return False
+
+    def _ffmpeg_input_args(self, codec_args):
+        """
+        FFmpeg input options for the Apify file
+        
+        The input is a known MP3/audio file: read 32 KB to detect the stream
+        instead of ffmpeg's default 5 MB probe.
+        """
+        args = ['-probesize', '32k']
+        if codec_args == self.COPY_CODEC_ARGS:
+            # Copy mode doesn't need sample-accurate seeking
+            args += ['-fflags', '+fastseek']
+        return args
+
+    def _extract_clip_from_url(self, download_url, mp3_path, codec_args):
+        """
+        Extract the clip with FFmpeg reading the Apify URL directly
+        
+        -ss before -i seeks on the input side: FFmpeg jumps to 15s with an
+        HTTP Range request, so only the 30 seconds we keep are downloaded.
+        
+        Returns:
+            True if the clip was written
+        """
+        logger.info("⏩ Extracting clip directly from Apify URL (HTTP seek)...")
+        
+        try:
             ffmpeg_result = subprocess.run(
                 [
                     'ffmpeg',
-                    '-i', raw_path,
-                    '-ss', '15',       # Start at 15 seconds
-                    '-t', '30',        # Extract 30 seconds
-                    '-acodec', 'copy', # Copy without re-encoding
-                    '-y',              # Overwrite if exists
+                    *self._ffmpeg_input_args(codec_args),
+                    '-ss', str(self.CLIP_START),     # Input seek to 15 seconds
+                    '-i', download_url,
+                    '-t', str(self.CLIP_DURATION),   # Extract 30 seconds
+                    '-vn',                           # Drop embedded cover art
+                    *codec_args,                     # Copy MP3, or re-encode
+                    '-y',                            # Overwrite if exists
                     mp3_path
                 ],
                 capture_output=True,
                 text=True,
                 timeout=60
             )
+        except subprocess.TimeoutExpired:
+            logger.warning("⚠️ FFmpeg HTTP seek timeout (60s), falling back to download")
+            return False
+        
+        if ffmpeg_result.returncode != 0 or not os.path.exists(mp3_path) or os.path.getsize(mp3_path) == 0:
+            logger.warning(f"⚠️ FFmpeg HTTP seek failed, falling back to download: {ffmpeg_result.stderr[-300:]}")
+            return False
+        
+        return True
+
+    def _extract_clip_from_stream(self, download_url, mp3_path, codec_args):
+        """
+        Download the beginning of the file and pipe it into FFmpeg
+        
+        Returns:
+            True if the clip was written
+        """
+        logger.info(f"⬇️ Downloading MP3 file from Apify URL...")
+        
+        audio_response = self.session.get(download_url, timeout=self.AUDIO_TIMEOUT, stream=True)
+        
+        if audio_response.status_code != 200:
+            logger.error(f"❌ Failed to download audio: {audio_response.status_code}")
+            return False
+        
+        # Only the first MAX_DOWNLOAD_BYTES are read, whatever the file size
+        content_length = int(audio_response.headers.get('content-length', 0))
+        if content_length:
+            logger.info(f"📦 Audio file size: {content_length // (1024 * 1024)} MB")
+        
+        # Stream the download straight into FFmpeg - no raw file on disk
+        # -i pipe:0: Read MP3 from stdin
+        # -ss 15: Start at 15 seconds (skip potential intro/silence)
+        # -t 30: Extract 30 seconds duration
+        # -vn: Audio only - cover art in the ID3 tag would otherwise be copied into the clip
+        # codec_args: Copy MP3 without re-encoding (faster, no quality loss), or re-encode
+        with tempfile.TemporaryFile() as stderr_file:
+            process = subprocess.Popen(
+                [
+                    'ffmpeg',
+                    *self._ffmpeg_input_args(codec_args),
+                    '-i', 'pipe:0',
+                    '-ss', str(self.CLIP_START),     # Start at 15 seconds
+                    '-t', str(self.CLIP_DURATION),   # Extract 30 seconds
+                    '-vn',                           # Drop embedded cover art
+                    *codec_args,                     # Copy MP3, or re-encode
+                    '-y',                            # Overwrite if exists
+                    mp3_path
+                ],
+                stdin=subprocess.PIPE,
+                stdout=subprocess.DEVNULL,
+                stderr=stderr_file
+            )
             
-            # Clean up raw file immediately to save space
-            if os.path.exists(raw_path):
-                os.remove(raw_path)
-                logger.info(f"🗑️ Cleaned up raw file")
+            bytes_written = 0
+            deadline = time.time() + self.AUDIO_DOWNLOAD_DEADLINE
             
-            if ffmpeg_result.returncode != 0:
-                logger.error(f"❌ FFmpeg error: {ffmpeg_result.stderr[-500:]}")
-                return None
+            try:
+                # Only feed the beginning, the clip ends at 45s
+                for chunk in audio_response.iter_content(chunk_size=1024 * 1024):
+                    if chunk:
+                        process.stdin.write(chunk)
+                        bytes_written += len(chunk)
+                        if bytes_written >= self.MAX_DOWNLOAD_BYTES:
+                            logger.info("✂️ Enough audio for the clip, stopping download")
+                            break
+                    if time.time() > deadline:
+                        logger.warning(f"⚠️ Audio download too slow ({self.AUDIO_DOWNLOAD_DEADLINE}s), using what we have")
+                        break
+            except BrokenPipeError:
+                # FFmpeg exits as soon as it has written the 30 seconds
+                pass
+            finally:
+                audio_response.close()
+                try:
+                    process.stdin.close()
+                except BrokenPipeError:
+                    pass
             
-            if os.path.exists(mp3_path):
-                size_kb = os.path.getsize(mp3_path) // 1024
-                logger.info(f"✅ MP3 ready: {mp3_path} ({size_kb} KB) - Optimized 30s extract")
-                return mp3_path
+            try:
+                returncode = process.wait(timeout=60)
+            except subprocess.TimeoutExpired:
+                process.kill()
+                process.wait()
+                logger.error("❌ FFmpeg timeout (60s)")
+                return False
             
-            logger.error("❌ MP3 file not found after extraction")
+            stderr_file.seek(0)
+            ffmpeg_stderr = stderr_file.read().decode('utf-8', errors='replace')
+        
+        logger.info(f"✅ MP3 streamed through FFmpeg ({bytes_written // 1024} KB downloaded)")
+        
+        if returncode != 0:
+            logger.error(f"❌ FFmpeg error: {ffmpeg_stderr[-500:]}")
+            return False
+        
+        return True
+
+    def _info_from_apify_result(self, result, video_id):
+        """
+        Build the get_video_info dict from the Apify dataset item
+        
+        Returns:
+            Video info dict, or None if the item lacks title/author/views
+        """
+        if not result:
             return None
-            
-        except requests.exceptions.Timeout:
-            logger.error("❌ Apify API timeout (180s) - Actor may be slow or stuck")
-            logger.error("Consider increasing timeout if this happens frequently")
+        
+        def first(*fields):
+            for field in fields:
+                if result.get(field) not in (None, ''):
+                    return result[field]
             return None
-            
-        except Exception as e:
-            logger.error(f"❌ Download error: {str(e)}", exc_info=True)
+        
+        title = first('title', 'name')
+        author = first('channel', 'channelName', 'uploader', 'author', 'channelTitle')
+        views = first('viewCount', 'views', 'view_count')
+        
+        if not title or not author or views is None:
+            return None
+        
+        try:
+            views = int(views)
+        except (TypeError, ValueError):
             return None
+        
+        thumbnail = first('thumbnail', 'thumbnailUrl') or f"https://i.ytimg.com/vi/{video_id}/hqdefault.jpg"
+        
+        try:
+            duration = int(first('duration') or 0)
+        except (TypeError, ValueError):
+            duration = 0
+        
+        return {
+            'success': True,
+            'title': title,
+            'author': author,
+            'views': views,
+            'thumbnail': thumbnail,
+            'duration': duration
+        }
+
+    def fetch_all(self, youtube_url):
+        """
+        Get the clip and the video metadata, overlapping them when possible
+        
+        The clip cache and yt-dlp never return metadata: when one of them is
+        going to be tried, get_video_info starts in the background before the
+        download so the Data API call overlaps it. On the Apify-only path the
+        dataset item usually carries title/channel/views, in which case the
+        Data API is not called at all (saves quota); otherwise get_video_info
+        (cached) runs after the download.
+        
+        Args:
+            youtube_url: YouTube video URL
+        
+        Returns:
+            (video_info, audio_path) - audio_path is None if metadata or download failed
+        """
+        video_id = self._extract_video_id(youtube_url)
+        
+        if not video_id:
+            return {
+                'success': False,
+                'error': 'invalid_url',
+                'message': 'URL YouTube invalide'
+            }, None
+        
+        info_future = None
+        if self.ytdlp_enabled or self._has_cached_clip(video_id):
+            info_future = self.get_video_info_lazy(youtube_url)
+        
+        audio_path, apify_result = self._download_clip(youtube_url)
+        
+        video_info = self._info_from_apify_result(apify_result, video_id)
+        
+        if video_info:
+            logger.info(f"✅ Metadata taken from Apify result: {video_info['title'][:60]}")
+        elif info_future:
+            video_info = info_future.result()
+        else:
+            video_info = self.get_video_info(youtube_url)
+        
+        if not video_info['success']:
+            self.cleanup_audio(audio_path)
+            return video_info, None
+        
+        return video_info, audio_path
 
     def cleanup_audio(self, audio_path):
-        """Delete temporary audio file"""
+        """Delete temporary audio file (and its per-download directory)"""
         try:
             if audio_path and os.path.exists(audio_path):
-                os.remove(audio_path)
+                work_dir = os.path.dirname(audio_path)
+                if os.path.basename(work_dir).startswith('beatlink_'):
+                    shutil.rmtree(work_dir)
+                else:
+                    os.remove(audio_path)
                 logger.info(f"🗑️ Cleaned up: {audio_path}")
                 return True
         except Exception as e:
             logger.warning(f"⚠️ Cleanup failed: {str(e)}")
         return False
+
+    def close(self):
+        """Close pooled HTTP connections"""
+        self.session.close()
@@ -0,0 +1,16 @@
+"""
+WSGI entrypoint
+
+    gunicorn -k gevent --worker-connections 1000 --timeout 300 wsgi:app
+
+gevent must patch the standard library before requests, ssl or
+subprocess are imported, so that every external API call and FFmpeg
+run yields to other scans instead of blocking the worker.
+"""
+from gevent import monkey
+
+monkey.patch_all()
+
+from app import app, log_environment  # noqa: E402
+
+log_environment()